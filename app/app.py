@@ -14,7 +14,8 @@ import os
 # Add the parent directory to Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.inference import predict_from_symptoms, get_available_symptoms, get_available_diseases, get_disease_info
+from src.utils import load_processed_data
+from src.inference import predict_from_symptoms, predict_from_canonical_symptoms, predict_batch_from_symptoms, canonical_symptoms, get_available_symptoms, get_available_diseases, get_disease_info, get_model, load_disease_info
 
 # Create FastAPI app
 app = FastAPI(
@@ -23,31 +24,69 @@ app = FastAPI(
     version="1.0.0"
 )
 
-# Add CORS middleware
+# Add CORS middleware - only the frontend origin(s), comma-separated in FRONTEND_ORIGIN
+# Preflight responses are cached by browsers for a day (max_age)
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # In production, replace with your MERN app's domain
+    allow_origins=[o.strip() for o in os.environ.get("FRONTEND_ORIGIN", "http://localhost:3000").split(",")],
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["Content-Type"],
+    max_age=86400,
 )
 
+@app.on_event("startup")
+async def load_resources():
+    """Load processed data, disease info and the default model once per worker"""
+    load_processed_data()
+    load_disease_info()
+    app.state.model = get_model()
+
 # Pydantic models
 class SymptomRequest(BaseModel):
     symptoms: List[str]
     model_name: Optional[str] = "randomforest"
 
+class BatchSymptomRequest(BaseModel):
+    symptoms_batch: List[List[str]]
+    model_name: Optional[str] = "randomforest"
+
 class PredictionResponse(BaseModel):
     prediction: str
     confidence: float
     top_predictions: List[dict]
     disease_info: dict
 
+class BatchPredictionResponse(BaseModel):
+    predictions: List[PredictionResponse]
+
 class HealthResponse(BaseModel):
     status: str
     available_symptoms: int
     available_diseases: int
 
+def build_prediction_response(prediction, top_predictions):
+    """Build the API response for a single prediction"""
+    disease_info = get_disease_info(prediction)
+    confidence = top_predictions[0]['probability'] if top_predictions else 0.0
+    
+    return PredictionResponse(
+        prediction=prediction,
+        confidence=confidence,
+        top_predictions=top_predictions,
+        disease_info=disease_info
+    )
+
+def prediction_result_response(prediction, top_predictions, error):
+    """Turn a (prediction, top_predictions, error) result into a response or HTTP error"""
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+    
+    if not prediction:
+        raise HTTPException(status_code=500, detail="Prediction failed")
+    
+    return build_prediction_response(prediction, top_predictions)
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -59,6 +98,7 @@ async def root():
             "/symptoms": "Get available symptoms",
             "/diseases": "Get available diseases",
             "/predict": "Predict disease from symptoms",
+            "/predict_batch": "Predict diseases for several symptom lists",
             "/docs": "API documentation"
         }
     }
@@ -107,39 +147,51 @@ async def predict_disease(request: SymptomRequest):
         if not request.symptoms:
             raise HTTPException(status_code=400, detail="No symptoms provided")
         
-        prediction, top_predictions, error = predict_from_symptoms(
+        return prediction_result_response(*predict_from_symptoms(
             request.symptoms, 
             request.model_name
-        )
+        ))
         
-        if error:
-            raise HTTPException(status_code=400, detail=error)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
+
+@app.post("/predict_batch", response_model=BatchPredictionResponse)
+async def predict_disease_batch(request: BatchSymptomRequest):
+    """Predict diseases for several symptom lists in one model call"""
+    try:
+        if not request.symptoms_batch:
+            raise HTTPException(status_code=400, detail="No symptoms provided")
         
-        if not prediction:
-            raise HTTPException(status_code=500, detail="Prediction failed")
+        results = predict_batch_from_symptoms(
+            request.symptoms_batch,
+            request.model_name
+        )
         
-        disease_info = get_disease_info(prediction)
-        confidence = top_predictions[0]['probability'] if top_predictions else 0.0
+        predictions = []
+        for i, (prediction, top_predictions, error) in enumerate(results):
+            if error:
+                raise HTTPException(status_code=400, detail=f"Item {i}: {error}")
+            predictions.append(build_prediction_response(prediction, top_predictions))
         
-        return PredictionResponse(
-            prediction=prediction,
-            confidence=confidence,
-            top_predictions=top_predictions,
-            disease_info=disease_info
-        )
+        return BatchPredictionResponse(predictions=predictions)
         
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
 
-@app.get("/predict/{symptoms}")
+@app.get("/predict/{symptoms}", response_model=PredictionResponse)
 async def predict_disease_get(symptoms: str):
     """Predict disease from symptoms (GET method)"""
     try:
-        symptom_list = [s.strip().lower() for s in symptoms.split(',')]
-        request = SymptomRequest(symptoms=symptom_list)
-        return await predict_disease(request)
+        # Parsed and canonicalised once, skipping SymptomRequest validation
+        symptoms_key = canonical_symptoms(symptoms.split(','))
+        if not symptoms_key:
+            raise HTTPException(status_code=400, detail="No symptoms provided")
+        
+        return prediction_result_response(*predict_from_canonical_symptoms(symptoms_key))
         
     except HTTPException:
         raise
@@ -149,16 +201,27 @@ async def predict_disease_get(symptoms: str):
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8000))
     host = "0.0.0.0" if os.environ.get("PORT") else "127.0.0.1"
+    # Each worker holds its own copy of the data and model, so cap the default;
+    # os.cpu_count() reports the host's cores inside containers
+    workers = int(os.environ.get("UVICORN_WORKERS", min(os.cpu_count() or 1, 2)))
     
     print("🚀 Starting Disease Prediction API...")
     print(f"📖 API Documentation: http://{host}:{port}/docs")
     print(f"🔍 Health Check: http://{host}:{port}/health")
     print(f"🏥 Predict Disease: http://{host}:{port}/predict")
     
+    print(f"⚙️  Workers: {workers}")
+    
+    # Multiple workers need the app as an import string; "auto" picks
+    # uvloop/httptools when installed (uvloop is not available on Windows)
     uvicorn.run(
-        app,
+        "app:app",
         host=host,
         port=port,
+        workers=workers,
+        loop="auto",
+        http="auto",
+        access_log=False,
         reload=False,
         log_level="info"
     ) 
\ No newline at end of file
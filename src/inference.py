@@ -5,8 +5,59 @@ Uses processed datasets and trained models
 """
 
 import pandas as pd
-import numpy as np
-from src.utils import load_model, predict_disease, load_processed_data
+from functools import lru_cache
+from src.utils import (
+    load_model, load_onnx_model, predict_from_features, predicted_label,
+    build_feature_matrix, load_processed_data, symptom_indices, pack_symptoms,
+    unpack_symptoms, top_k_indices
+)
+
+# Loaded models, keyed by lowercased model name
+_models = {}
+
+def get_model(model_name='randomforest'):
+    """
+    Get a trained model, loading it from disk only on first use
+    
+    Prefers the ONNX export when available, else the sklearn model.
+    """
+    key = model_name.lower()
+    if key not in _models:
+        model = load_onnx_model(key)
+        if model is None:
+            model = load_model(key)
+        if model is None:
+            return None
+        _models[key] = model
+    return _models[key]
+
+def _disease_key(disease_name):
+    """
+    Lookup key for a disease name (stripped, lowercased)
+    """
+    return str(disease_name).strip().lower()
+
+@lru_cache(maxsize=1)
+def load_disease_info():
+    """
+    Load disease descriptions and precautions once, keyed by _disease_key
+    """
+    desc_df = pd.read_csv('content/symptom_Description.csv')
+    descriptions = {
+        _disease_key(disease): description
+        for disease, description in zip(desc_df['Disease'], desc_df['Description'])
+    }
+    
+    prec_df = pd.read_csv('content/symptom_precaution.csv')
+    precaution_columns = [col for col in prec_df.columns if col != 'Disease']
+    precautions = {}
+    for disease, *values in zip(prec_df['Disease'], *(prec_df[col] for col in precaution_columns)):
+        precautions[_disease_key(disease)] = [
+            str(value).strip() for value in values
+            if pd.notna(value) and str(value).strip()
+        ]
+    
+    return descriptions, precautions
 
 def get_available_symptoms():
     """
@@ -14,7 +65,7 @@ def get_available_symptoms():
     """
     try:
         # Use the same function as training to avoid duplication
-        _, symptoms_list, _ = load_processed_data()
+        _, symptoms_list, _, _ = load_processed_data()
         return symptoms_list or []
     except:
         return []
@@ -25,88 +76,136 @@ def get_available_diseases():
     """
     try:
         # Use the same function as training to avoid duplication
-        _, _, disease_dist = load_processed_data()
-        if disease_dist is not None:
-            return disease_dist['disease'].tolist()
-        return []
+        _, _, _, disease_list = load_processed_data()
+        return disease_list or []
     except:
         return []
 
+def canonical_symptoms(symptoms):
+    """
+    Canonical form of a symptom list: stripped, lowercased, unique and sorted
+    """
+    return tuple(sorted({s.strip().lower() for s in symptoms if s.strip()}))
+
 def predict_from_symptoms(symptoms, model_name='randomforest'):
     """
     Predict disease from list of symptoms
+    
+    Predictions are deterministic, so results are cached per symptom set and model.
+    """
+    return predict_from_canonical_symptoms(canonical_symptoms(symptoms), model_name)
+
+def predict_from_canonical_symptoms(symptoms_key, model_name='randomforest'):
+    """
+    Predict disease from symptoms already in canonical form (see canonical_symptoms)
     """
     # Load model and symptoms list
-    model = load_model(model_name)
-    _, symptoms_list, _ = load_processed_data()
+    model = get_model(model_name)
+    _, _, symptoms_index, _ = load_processed_data()
     
-    if model is None or symptoms_list is None:
+    # Checked before the cache so a missing model/dataset is not cached
+    if model is None or symptoms_index is None:
         return None, None, "Model or symptoms list not found"
     
     # Validate symptoms
-    valid_symptoms = []
-    invalid_symptoms = []
-    
-    for symptom in symptoms:
-        if symptom in symptoms_list:
-            valid_symptoms.append(symptom)
-        else:
-            invalid_symptoms.append(symptom)
+    indices = symptom_indices(symptoms_key, symptoms_index)
     
-    if not valid_symptoms:
+    if len(indices) == 0:
         return None, None, "No valid symptoms provided"
     
-    # Make prediction
+    # Cache key is the packed bitset of valid symptoms, so order, duplicates
+    # and unknown symptoms don't create separate entries
+    return _predict_cached(pack_symptoms(indices, len(symptoms_index)), model_name.lower())
+
+@lru_cache(maxsize=4096)
+def _predict_cached(packed_symptoms, model_name):
+    """
+    Predict disease from a packed symptom bitset (see utils.pack_symptoms)
+    """
+    model = get_model(model_name)
+    _, _, symptoms_index, _ = load_processed_data()
+    
+    # Make prediction - expanded to a dense vector only at the model boundary
     try:
-        prediction, probabilities = predict_disease(valid_symptoms, model, symptoms_list)
-        
-        # Get top 3 predictions with probabilities
-        disease_names = get_available_diseases()
-        if disease_names:
-            # Get indices of top 3 probabilities
-            top_indices = np.argsort(probabilities)[-3:][::-1]
-            top_predictions = []
-            
-            for idx in top_indices:
-                if idx < len(disease_names):
-                    top_predictions.append({
-                        'disease': disease_names[idx],
-                        'probability': float(probabilities[idx])
-                    })
-        else:
-            top_predictions = [{'disease': prediction, 'probability': float(max(probabilities))}]
+        features = unpack_symptoms(packed_symptoms, len(symptoms_index))
+        prediction, probabilities = predict_from_features(features, model)
+        top_predictions = _top_predictions(model.classes_, probabilities)
         
         return prediction, top_predictions, None
         
     except Exception as e:
         return None, None, f"Prediction error: {str(e)}"
 
+def _top_predictions(disease_names, probabilities, k=3):
+    """
+    Get top k predictions with probabilities
+    
+    Probabilities are ordered by model.classes_, not the disease CSV.
+    """
+    top_predictions = []
+    
+    for idx in top_k_indices(probabilities, k):
+        top_predictions.append({
+            'disease': str(disease_names[idx]),
+            'probability': float(probabilities[idx])
+        })
+    
+    return top_predictions
+
+def predict_batch_from_symptoms(symptoms_batch, model_name='randomforest'):
+    """
+    Predict diseases for several symptom lists with a single model call
+    
+    Returns one (prediction, top_predictions, error) tuple per symptom list.
+    """
+    # Load model and symptoms list
+    model = get_model(model_name)
+    _, _, symptoms_index, _ = load_processed_data()
+    
+    if model is None or symptoms_index is None:
+        return [(None, None, "Model or symptoms list not found")] * len(symptoms_batch)
+    
+    results = [(None, None, "No valid symptoms provided")] * len(symptoms_batch)
+    
+    # Only rows with at least one known symptom go to the model
+    rows = []
+    valid_batch = []
+    for row, symptoms in enumerate(symptoms_batch):
+        valid_symptoms = [s for s in canonical_symptoms(symptoms) if s in symptoms_index]
+        if valid_symptoms:
+            rows.append(row)
+            valid_batch.append(valid_symptoms)
+    
+    if not rows:
+        return results
+    
+    # Make predictions - one (B, S) matrix, one predict_proba call
+    try:
+        probabilities = model.predict_proba(build_feature_matrix(valid_batch, symptoms_index))
+    except Exception as e:
+        error = f"Prediction error: {str(e)}"
+        for row in rows:
+            results[row] = (None, None, error)
+        return results
+    
+    for row, row_probabilities in zip(rows, probabilities):
+        prediction = predicted_label(model.classes_, row_probabilities)
+        top_predictions = _top_predictions(model.classes_, row_probabilities)
+        results[row] = (prediction, top_predictions, None)
+    
+    return results
+
 def get_disease_info(disease_name):
     """
     Get disease description and precautions
     """
     try:
-        # Load disease description
-        desc_df = pd.read_csv('content/symptom_Description.csv')
-        desc_info = desc_df[desc_df['Disease'].str.strip() == disease_name.strip()]
-        
-        # Load precautions
-        prec_df = pd.read_csv('content/symptom_precaution.csv')
-        prec_info = prec_df[prec_df['Disease'].str.strip() == disease_name.strip()]
-        
-        description = desc_info['Description'].iloc[0] if not desc_info.empty else "No description available"
-        precautions = []
-        
-        if not prec_info.empty:
-            for col in prec_info.columns:
-                if col != 'Disease':
-                    value = prec_info[col].iloc[0]
-                    if pd.notna(value) and str(value).strip():
-                        precautions.append(str(value).strip())
+        descriptions, precautions = load_disease_info()
+        key = _disease_key(disease_name)
         
         return {
-            'description': description,
-            'precautions': precautions
+            'description': descriptions.get(key, "No description available"),
+            'precautions': list(precautions.get(key, []))
         }
         
     except Exception as e:
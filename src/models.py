@@ -3,20 +3,27 @@
 Model definitions for disease prediction
 """
 
+from sklearn.calibration import CalibratedClassifierCV
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.linear_model import LogisticRegression
-from sklearn.svm import SVC
+from sklearn.svm import LinearSVC
 from sklearn.tree import DecisionTreeClassifier
 
 
 def get_all_models():
     """
     Get all models for training
+    
+    Models are fitted in parallel (one per process), so each uses a single core.
     """
     models = {
-        'RandomForest': RandomForestClassifier(n_estimators=100, random_state=42),
+        'RandomForest': RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=1),
         'LogisticRegression': LogisticRegression(max_iter=1000, random_state=42),
-        'SVC': SVC(kernel='rbf', random_state=42, probability=True),
+        # Calibrated linear SVM: predict_proba without SVC(probability=True)'s
+        # much slower internal Platt-scaling cross-validation
+        'LinearSVC': CalibratedClassifierCV(
+            estimator=LinearSVC(dual='auto', max_iter=2000, random_state=42), cv=3
+        ),
         'DecisionTree': DecisionTreeClassifier(random_state=42)
     }
     return models 
\ No newline at end of file
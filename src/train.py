@@ -8,12 +8,32 @@ import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, classification_report
+from joblib import Parallel, delayed
 import warnings
 warnings.filterwarnings('ignore')
 
-from src.utils import load_processed_data, prepare_features, save_model
+from src.utils import load_processed_data, prepare_features, save_model, export_onnx
 from src.models import get_all_models
 
+def _fit_and_evaluate(name, model, X_train, y_train, X_test, y_test):
+    """
+    Train one model and evaluate it on the test set (runs in a worker process)
+    """
+    try:
+        # Train model
+        model.fit(X_train, y_train)
+        
+        # Make predictions
+        y_pred = model.predict(X_test)
+        
+        # Calculate accuracy
+        accuracy = accuracy_score(y_test, y_pred)
+        
+        return name, accuracy, model, y_pred, None
+        
+    except Exception as e:
+        return name, 0.0, None, None, e
+
 def train_models():
     """
     Train multiple models and select the best one
@@ -21,7 +41,7 @@ def train_models():
     print("🚀 Starting model training...")
     
     # Load processed data
-    df, symptoms_list, disease_dist = load_processed_data()
+    df, symptoms_list, _, _ = load_processed_data()
     
     if df is None:
         print("❌ Failed to load data. Please run the EDA notebook first.")
@@ -41,45 +61,39 @@ def train_models():
     # Get all models
     models = get_all_models()
     
-    # Train and evaluate each model
+    # Train and evaluate each model - one model per core, in parallel
+    print(f"\n🤖 Training {', '.join(models)}...")
+    
+    outputs = Parallel(n_jobs=-1, backend='loky')(
+        delayed(_fit_and_evaluate)(name, model, X_train, y_train, X_test, y_test)
+        for name, model in models.items()
+    )
+    
     results = {}
     
-    for name, model in models.items():
-        print(f"\n🤖 Training {name}...")
+    for name, accuracy, model, y_pred, error in outputs:
+        if error is not None:
+            print(f"❌ Error training {name}: {error}")
+            continue
+        
+        # Keep the fitted model and its test predictions for reuse
+        results[name] = (accuracy, model, y_pred)
         
-        try:
-            # Train model
-            model.fit(X_train, y_train)
-            
-            # Make predictions
-            y_pred = model.predict(X_test)
-            
-            # Calculate accuracy
-            accuracy = accuracy_score(y_test, y_pred)
-            results[name] = accuracy
-            
-            print(f"✅ {name} accuracy: {accuracy:.3f}")
-            
-        except Exception as e:
-            print(f"❌ Error training {name}: {e}")
-            results[name] = 0.0
+        print(f"✅ {name} accuracy: {accuracy:.3f}")
     
     # Find best model
     if results:
-        best_model_name = max(results, key=results.get)
-        best_accuracy = results[best_model_name]
+        best_model_name = max(results, key=lambda name: results[name][0])
+        best_accuracy, best_model_instance, y_pred_best = results[best_model_name]
         
         print(f"\n🏆 BEST MODEL: {best_model_name}")
         print(f"📈 Best accuracy: {best_accuracy:.3f}")
         
-        # Save ONLY the best model
-        best_model_instance = models[best_model_name]
-        best_model_instance.fit(X_train, y_train)  # Retrain on full training data
+        # Save ONLY the best model (already fitted on the training data)
         save_model(best_model_instance, best_model_name)
+        export_onnx(best_model_instance, best_model_name, len(symptoms_list))
         
         # Final evaluation of best model
-        y_pred_best = best_model_instance.predict(X_test)
-        
         print(f"\n📋 Final Evaluation of {best_model_name}:")
         print(classification_report(y_test, y_pred_best))
         
@@ -6,35 +6,59 @@ Uses processed datasets from EDA notebook
 
 import pandas as pd
 import numpy as np
-import pickle
+import joblib
+import json
+from collections import namedtuple
+from functools import lru_cache
 from pathlib import Path
 
+try:
+    import onnxruntime
+except ImportError:
+    onnxruntime = None
+
+ProcessedData = namedtuple(
+    'ProcessedData', ['df', 'symptoms_list', 'symptoms_index', 'disease_list']
+)
+
+@lru_cache(maxsize=1)
+def _read_processed_data():
+    """
+    Read processed datasets from disk (cached, read once per process)
+    """
+    # Load main processed dataset
+    df = pd.read_csv('data/processed/processed_dataset.csv')
+    
+    # Load symptoms list
+    symptoms_df = pd.read_csv('data/processed/symptoms_list.csv')
+    symptoms_list = symptoms_df['symptom'].tolist()
+    symptoms_index = {symptom: i for i, symptom in enumerate(symptoms_list)}
+    
+    # Load disease distribution
+    disease_dist = pd.read_csv('data/processed/disease_distribution.csv')
+    disease_list = disease_dist['disease'].tolist()
+    
+    print(f"✅ Loaded processed data:")
+    print(f"   • Dataset: {df.shape[0]} patients, {df.shape[1]} features")
+    print(f"   • Symptoms: {len(symptoms_list)} unique symptoms")
+    print(f"   • Diseases: {len(disease_list)} unique diseases")
+    
+    return ProcessedData(df, symptoms_list, symptoms_index, disease_list)
+
 def load_processed_data():
     """
     Load processed datasets from the EDA notebook
+    
+    Results are cached, so repeated calls only hit the in-memory data.
     """
     try:
-        # Load main processed dataset
-        df = pd.read_csv('data/processed/processed_dataset.csv')
-        
-        # Load symptoms list
-        symptoms_df = pd.read_csv('data/processed/symptoms_list.csv')
-        symptoms_list = symptoms_df['symptom'].tolist()
-        
-        # Load disease distribution
-        disease_dist = pd.read_csv('data/processed/disease_distribution.csv')
-        
-        print(f"✅ Loaded processed data:")
-        print(f"   • Dataset: {df.shape[0]} patients, {df.shape[1]} features")
-        print(f"   • Symptoms: {len(symptoms_list)} unique symptoms")
-        print(f"   • Diseases: {len(disease_dist)} unique diseases")
-        
-        return df, symptoms_list, disease_dist
+        return _read_processed_data()
         
     except FileNotFoundError as e:
+        # Not cached, so the data is picked up once the notebook has been run
         print(f"❌ Error: {e}")
         print("Please run the EDA notebook first to create processed datasets")
-        return None, None, None
+        return ProcessedData(None, None, None, None)
 
 def prepare_features(df, symptoms_list):
     """
@@ -42,12 +66,22 @@ def prepare_features(df, symptoms_list):
     """
     # Separate features and target - ONLY SYMPTOMS
     feature_columns = symptoms_list  # Only use symptom features
-    X = df[feature_columns]
-    y = df['Disease']
+    missing_columns = [c for c in feature_columns if c not in df.columns]
+    if missing_columns:
+        # Kept as all-zero columns so features stay aligned with symptoms_list
+        print(f"⚠️  Symptoms missing from dataset: {missing_columns}")
+    
+    # Binary 0/1 features stored as contiguous float32 (what the tree models use
+    # internally, so sklearn does not need to copy/convert them); columns are
+    # reordered once here and everything downstream works on plain ndarrays
+    X = np.ascontiguousarray(
+        df.reindex(columns=feature_columns, fill_value=0).to_numpy(dtype=np.float32)
+    )
+    y = df['Disease'].to_numpy()
     
     print(f"✅ Prepared features:")
     print(f"   • Input features: {len(feature_columns)}")
-    print(f"   • Target classes: {len(y.unique())}")
+    print(f"   • Target classes: {len(np.unique(y))}")
     
     return X, y
 
@@ -58,44 +92,169 @@ def save_model(model, model_name):
     model_dir = Path('model')
     model_dir.mkdir(exist_ok=True)
     
-    model_path = model_dir / f'{model_name.lower()}_model.pkl'
+    model_path = model_dir / f'{model_name.lower()}_model.joblib'
     
-    with open(model_path, 'wb') as f:
-        pickle.dump(model, f)
+    # Compressed joblib is much smaller than a plain pickle and fast to load
+    joblib.dump(model, model_path, compress=3)
     
     print(f"💾 Model saved: {model_path}")
 
 def load_model(model_name):
     """
     Load trained model
+    
+    Falls back to a legacy pickle (<name>_model.pkl) if no joblib file exists.
     """
-    model_path = Path('model') / f'{model_name.lower()}_model.pkl'
+    model_dir = Path('model')
+    model_path = model_dir / f'{model_name.lower()}_model.joblib'
+    
+    if not model_path.exists():
+        model_path = model_dir / f'{model_name.lower()}_model.pkl'
     
     if not model_path.exists():
         print(f"❌ Model not found: {model_path}")
         return None
     
-    with open(model_path, 'rb') as f:
-        model = pickle.load(f)
+    # joblib.load also reads plain pickle files
+    model = joblib.load(model_path)
     
     print(f"✅ Model loaded: {model_path}")
     return model
 
-def predict_disease(symptoms, model, symptoms_list):
+class OnnxModel:
+    """
+    ONNX Runtime session exposing the sklearn calls used for inference
+    (classes_ and predict_proba)
+    """
+    
+    def __init__(self, model_path):
+        self.session = onnxruntime.InferenceSession(
+            str(model_path), providers=['CPUExecutionProvider']
+        )
+        self.input_name = self.session.get_inputs()[0].name
+        
+        # skl2onnx classifiers output (label, probabilities)
+        self.probability_name = self.session.get_outputs()[1].name
+        
+        # Class labels are stored in the model metadata by export_onnx
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.classes_ = np.array(json.loads(metadata['classes']))
+    
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        return self.session.run([self.probability_name], {self.input_name: X})[0]
+
+def export_onnx(model, model_name, n_features):
     """
-    Predict disease based on symptoms
+    Export trained model to ONNX for faster inference
     """
-    # Create feature vector - ONLY SYMPTOMS
-    features = np.zeros(len(symptoms_list))
+    model_path = Path('model') / f'{model_name.lower()}_model.onnx'
     
-    # Set symptoms to 1
-    for symptom in symptoms:
-        if symptom in symptoms_list:
-            idx = symptoms_list.index(symptom)
-            features[idx] = 1
+    try:
+        from skl2onnx import convert_sklearn
+        from skl2onnx.common.data_types import FloatTensorType
+        
+        onnx_model = convert_sklearn(
+            model,
+            initial_types=[('input', FloatTensorType([None, n_features]))],
+            options={id(model): {'zipmap': False}}
+        )
+        classes = onnx_model.metadata_props.add()
+        classes.key = 'classes'
+        classes.value = json.dumps([str(c) for c in model.classes_])
+        
+        model_path.write_bytes(onnx_model.SerializeToString())
+        
+    except Exception as e:
+        # Don't leave an ONNX file from a previous model to be served instead
+        model_path.unlink(missing_ok=True)
+        print(f"⚠️  ONNX export skipped: {e}")
+        return None
     
-    # Make prediction
-    prediction = model.predict([features])[0]
-    probability = model.predict_proba([features])[0]
+    print(f"💾 ONNX model saved: {model_path}")
+    return model_path
+
+def load_onnx_model(model_name):
+    """
+    Load ONNX model, or None if onnxruntime or the ONNX file is missing
+    """
+    model_path = Path('model') / f'{model_name.lower()}_model.onnx'
+    
+    if onnxruntime is None or not model_path.exists():
+        return None
+    
+    model = OnnxModel(model_path)
+    
+    print(f"✅ ONNX model loaded: {model_path}")
+    return model
+
+def predict_from_features(features, model):
+    """
+    Predict disease from a single feature vector
+    """
+    # Make prediction - a single predict_proba pass, label taken from the argmax
+    probability = model.predict_proba(features.reshape(1, -1))[0]
+    prediction = predicted_label(model.classes_, probability)
+    
+    return prediction, probability
+
+def predicted_label(classes, probability):
+    """
+    Get the predicted class for one row of predict_proba output (its argmax)
+    """
+    return str(classes[int(np.argmax(probability))])
+
+def pack_symptoms(indices, n_symptoms):
+    """
+    Pack symptom column indices into a bitset (1 bit per symptom, as bytes)
+    
+    The bitset is small and hashable, so it works as a cache key.
+    """
+    bits = np.zeros(n_symptoms, dtype=np.uint8)
+    bits[indices] = 1
+    return np.packbits(bits).tobytes()
+
+def unpack_symptoms(packed, n_symptoms):
+    """
+    Expand a packed symptom bitset into a float32 feature vector
+    """
+    bits = np.unpackbits(np.frombuffer(packed, dtype=np.uint8), count=n_symptoms)
+    return bits.astype(np.float32)
+
+def symptom_indices(symptoms, symptoms_index):
+    """
+    Get feature column indices of the known symptoms (unknown ones are skipped)
+    """
+    indices = [symptoms_index[s] for s in symptoms if s in symptoms_index]
+    return np.array(indices, dtype=np.intp)
+
+def build_feature_matrix(symptoms_batch, symptoms_index):
+    """
+    Build a (batch, n_symptoms) feature matrix from several symptom lists
+    """
+    X = np.zeros((len(symptoms_batch), len(symptoms_index)), dtype=np.float32)
+    
+    # Gather (row, column) pairs, then set them all to 1 in a single scatter
+    columns = [symptom_indices(symptoms, symptoms_index) for symptoms in symptoms_batch]
+    if columns:
+        rows = np.repeat(np.arange(len(columns)), [len(c) for c in columns])
+        X[rows, np.concatenate(columns)] = 1.0
+    
+    return X
+
+def top_k_indices(probabilities, k=3):
+    """
+    Get indices of the k highest probabilities, highest first
+    
+    Uses argpartition (O(n)) and only sorts the selected entries. Ties go to
+    the lowest index, so the first index always matches np.argmax.
+    """
+    k = min(k, len(probabilities))
+    if k == 0:
+        return np.array([], dtype=np.intp)
     
-    return prediction, probability 
\ No newline at end of file
+    # argpartition picks arbitrarily among values tied at the k-th place, so
+    # take every index at or above that value (in index order) before sorting
+    threshold = probabilities[np.argpartition(probabilities, -k)[-k:]].min()
+    part = np.flatnonzero(probabilities >= threshold)
+    return part[np.argsort(-probabilities[part], kind='stable')][:k] 
\ No newline at end of file